@@ -1,21 +1,65 @@
 #!/usr/bin/env python3
 import argparse
+import importlib.util
 import json
 import os
+import signal
 import sys
-from typing import Any, Dict, List, Optional, Tuple
+import threading
+import time
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
 
-import requests
-from dotenv import load_dotenv
+try:
+    import orjson
+except ImportError:  # optional, stdlib json is used otherwise
+    orjson = None
 
-load_dotenv()
+# asyncio, concurrent.futures, requests, dotenv and httpx are imported where
+# first needed so `--help` stays fast.
+if TYPE_CHECKING:
+    import asyncio
+    from concurrent.futures import Future
 
+    import httpx
+    import requests
 
-def _bool_env(name: str, default: bool = True) -> bool:
-    val = os.getenv(name)
-    if val is None:
-        return default
-    return val.strip().lower() in ("1", "true", "yes", "y", "on")
+
+def _first(env: Mapping[str, str], *keys: str, default: Optional[str] = None) -> Optional[str]:
+    """Return the value of the first key that is set and non-empty."""
+    return next((env[k] for k in keys if env.get(k)), default)
+
+
+_RETRY_STATUSES = (429, 502, 503, 504)
+# Statuses that mean the request was refused before Kibana ran it, so a converse
+# POST can be re-sent without adding a duplicate round to the conversation.
+_POST_RETRY_STATUSES = (429, 503)
+
+
+def _retry_policy() -> Any:
+    """Retry connection failures, plus gateway statuses that are safe per method.
+
+    GETs retry on all of ``_RETRY_STATUSES``. Converse POSTs are not idempotent:
+    a 502/504 from a proxy, or a read error or timeout, may come after Kibana
+    already processed the turn. So POSTs only retry on ``_POST_RETRY_STATUSES``
+    and never on read errors.
+    """
+    from urllib3.util.retry import Retry
+
+    class _Retry(Retry):
+        def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+            if method and method.upper() == "POST" and status_code not in _POST_RETRY_STATUSES:
+                return False
+            return super().is_retry(method, status_code, has_retry_after)
+
+    return _Retry(
+        total=3,
+        connect=3,
+        read=0,
+        backoff_factor=0.3,
+        status_forcelist=_RETRY_STATUSES,
+        allowed_methods=frozenset(["GET", "POST"]),
+        raise_on_status=False,
+    )
 
 
 class AgentBuilderClient:
@@ -24,6 +68,7 @@ class AgentBuilderClient:
     Endpoints:
     - GET /api/agent_builder/agents
     - POST /api/agent_builder/converse
+    - POST /api/agent_builder/converse/async (server-sent events)
     """
 
     def __init__(
@@ -33,43 +78,100 @@ class AgentBuilderClient:
         space_id: Optional[str] = None,
         verify_ssl: bool = True,
         timeout_s: int = 300,
+        agents_ttl_s: float = 60,
+        pool_maxsize: int = 16,
     ):
         self.kibana_url = kibana_url.rstrip("/")
         self.space_id = space_id
         self.verify_ssl = verify_ssl
         self.timeout_s = timeout_s
         self.base_path = f"/s/{space_id}" if space_id else ""
+        self._url_list_agents = self._url("/api/agent_builder/agents")
+        self._url_converse = self._url("/api/agent_builder/converse")
+        self._url_converse_stream = self._url("/api/agent_builder/converse/async")
+        self._agents_ttl = agents_ttl_s
+        self._agents_cache: Optional[Tuple[float, List[Dict[str, Any]]]] = None
+        self._inflight: Dict[str, "Future[Dict[str, Any]]"] = {}
+        self._inflight_lock = threading.Lock()
+
+        import requests
 
         self.session = requests.Session()
-        self.session.headers.update(
-            {
-                "Authorization": f"ApiKey {api_key}",
-                "Content-Type": "application/json",
-                "kbn-xsrf": "true",
-            }
+        self._mount_adapter(pool_maxsize)
+        self.headers = {
+            "Authorization": f"ApiKey {api_key}",
+            "Content-Type": "application/json",
+            "kbn-xsrf": "true",
+        }
+        self.session.headers.update(self.headers)
+
+    def _mount_adapter(self, pool_maxsize: int) -> None:
+        from requests.adapters import HTTPAdapter
+
+        # Keep connections alive across chat turns and retry transient failures.
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=pool_maxsize,
+            max_retries=_retry_policy(),
         )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
 
     def _url(self, path: str) -> str:
         return f"{self.kibana_url}{self.base_path}{path}"
 
+    def invalidate_agents_cache(self) -> None:
+        self._agents_cache = None
+
     def list_agents(self) -> List[Dict[str, Any]]:
-        url = self._url("/api/agent_builder/agents")
-        resp = self.session.get(url, verify=self.verify_ssl, timeout=60)
+        return list(self.iter_agents())
+
+    def iter_agents(self) -> Iterator[Dict[str, Any]]:
+        """Yield agents one at a time.
+
+        Served from the TTL cache when fresh. Otherwise the response is parsed
+        incrementally with ijson when it is installed, so with caching disabled
+        (``agents_ttl_s=0``) the full catalog is never held in memory.
+        """
+        if self._agents_cache is not None:
+            ts, cached = self._agents_cache
+            if time.monotonic() - ts < self._agents_ttl:
+                yield from cached
+                return
+
+        agents: Optional[List[Dict[str, Any]]] = [] if self._agents_ttl > 0 else None
+        for agent in self._stream_agents():
+            if agents is not None:
+                agents.append(agent)
+            yield agent
+        if agents is not None:
+            self._agents_cache = (time.monotonic(), agents)
+
+    def _stream_agents(self) -> Iterator[Dict[str, Any]]:
+        resp = self.session.get(self._url_list_agents, verify=self.verify_ssl, timeout=60, stream=True)
+        with resp:
+            resp.raise_for_status()
+            try:
+                import ijson
+            except ImportError:  # optional, fall back to parsing the whole body
+                yield from _agents_from_json(resp.json())
+                return
+            resp.raw.decode_content = True
+            yield from _iter_agents_from_ijson(resp.raw)
+
+    def _post_json(self, url: str, payload: Dict[str, Any], **kwargs: Any) -> "requests.Response":
+        if orjson is not None:
+            return self.session.post(url, data=orjson.dumps(payload), **kwargs)
+        return self.session.post(url, json=payload, **kwargs)
+
+    def _raise_for_status(self, resp: "requests.Response") -> None:
+        # A 404 from converse usually means the agent was deleted; refresh the catalog next time.
+        if resp.status_code == 404:
+            self.invalidate_agents_cache()
         resp.raise_for_status()
-        data = resp.json()
-
-        if isinstance(data, dict):
-            if isinstance(data.get("results"), list):
-                return data["results"]
-            if isinstance(data.get("agents"), list):
-                return data["agents"]
-            return [data]
-        if isinstance(data, list):
-            return data
-        return []
 
-    def converse(
-        self,
+    @staticmethod
+    def _converse_payload(
         input_text: str,
         agent_id: str,
         conversation_id: Optional[str] = None,
@@ -77,7 +179,6 @@ class AgentBuilderClient:
         configuration_overrides: Optional[Dict[str, Any]] = None,
         prompts: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
-        url = self._url("/api/agent_builder/converse")
         payload: Dict[str, Any] = {"input": input_text, "agent_id": agent_id}
         if conversation_id:
             payload["conversation_id"] = conversation_id
@@ -87,21 +188,287 @@ class AgentBuilderClient:
             payload["configuration_overrides"] = configuration_overrides
         if prompts:
             payload["prompts"] = prompts
+        return payload
 
-        resp = self.session.post(
-            url,
-            data=json.dumps(payload),
+    def converse(
+        self,
+        input_text: str,
+        agent_id: str,
+        conversation_id: Optional[str] = None,
+        connector_id: Optional[str] = None,
+        configuration_overrides: Optional[Dict[str, Any]] = None,
+        prompts: Optional[Dict[str, Any]] = None,
+        coalesce: bool = False,
+    ) -> Dict[str, Any]:
+        """Send a converse request and return the JSON response.
+
+        With ``coalesce``, concurrent calls carrying an identical payload share
+        one in-flight request and receive the same result.
+        """
+        payload = self._converse_payload(
+            input_text, agent_id, conversation_id, connector_id, configuration_overrides, prompts
+        )
+        if not coalesce:
+            return self._post_converse(payload)
+
+        from concurrent.futures import Future
+
+        key = json.dumps(payload, sort_keys=True)
+        with self._inflight_lock:
+            fut = self._inflight.get(key)
+            owner = fut is None
+            if owner:
+                fut = self._inflight[key] = Future()
+        if not owner:
+            return fut.result()
+
+        try:
+            result = self._post_converse(payload)
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        else:
+            fut.set_result(result)
+            return result
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+
+    def _post_converse(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        resp = self._post_json(
+            self._url_converse,
+            payload,
             verify=self.verify_ssl,
             timeout=self.timeout_s,
         )
-        resp.raise_for_status()
+        self._raise_for_status(resp)
         return resp.json()
 
+    def converse_many(
+        self,
+        inputs: List[str],
+        agent_id: str,
+        max_concurrency: int = 1,
+        return_exceptions: bool = False,
+        **kwargs: Any,
+    ) -> List[Any]:
+        """Send independent converse requests concurrently over the shared session.
+
+        Results come back in input order. With ``return_exceptions`` a failed
+        request yields its exception in place of a result instead of raising.
+        Construct the client with ``pool_maxsize >= max_concurrency`` so every
+        worker gets a kept-alive connection.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        max_concurrency = max(1, max_concurrency)
+
+        def _one(text: str) -> Any:
+            try:
+                return self.converse(input_text=text, agent_id=agent_id, **kwargs)
+            except Exception as e:
+                if return_exceptions:
+                    return e
+                raise
+
+        with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+            return list(pool.map(_one, inputs))
 
-def format_agent_row(agent: Dict[str, Any]) -> Tuple[str, str, str]:
-    agent_id = str(agent.get("id") or agent.get("agent_id") or agent.get("uuid") or "")
-    name = str(agent.get("name") or agent.get("title") or agent.get("display_name") or "(unnamed)")
-    desc = str(agent.get("description") or agent.get("summary") or "")
+    def converse_stream(
+        self,
+        input_text: str,
+        agent_id: str,
+        conversation_id: Optional[str] = None,
+        connector_id: Optional[str] = None,
+        configuration_overrides: Optional[Dict[str, Any]] = None,
+        prompts: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Stream a converse round as server-sent events.
+
+        Yields ``(event, data)`` pairs as they arrive, e.g.
+        ``("message_chunk", {"text_chunk": "..."})`` or
+        ``("conversation_id_set", {"conversation_id": "..."})``.
+        """
+        payload = self._converse_payload(
+            input_text, agent_id, conversation_id, connector_id, configuration_overrides, prompts
+        )
+
+        resp = self._post_json(
+            self._url_converse_stream,
+            payload,
+            headers={"Accept": "text/event-stream"},
+            verify=self.verify_ssl,
+            timeout=self.timeout_s,
+            stream=True,
+        )
+        with resp:
+            self._raise_for_status(resp)
+            # Iterate raw bytes: SSE is UTF-8, but requests would decode a charset-less
+            # text/event-stream as ISO-8859-1. _SSEDecoder decodes each line as UTF-8.
+            yield from _iter_sse_events(resp.iter_lines())
+
+
+def _agents_from_json(data: Any) -> List[Dict[str, Any]]:
+    if isinstance(data, dict):
+        if isinstance(data.get("results"), list):
+            return data["results"]
+        if isinstance(data.get("agents"), list):
+            return data["agents"]
+        return [data]
+    if isinstance(data, list):
+        return data
+    return []
+
+
+_AGENT_LIST_PREFIXES = ("", "results", "agents")
+_ITEM_END_EVENTS = ("end_map", "end_array")
+
+
+def _iter_agents_from_ijson(fp: Any) -> Iterator[Any]:
+    from decimal import Decimal
+
+    import ijson
+
+    # Non-integers arrive as Decimal; convert them to float as json.loads does so
+    # agents stay JSON-serializable. use_float=True is avoided on purpose: the
+    # yajl2_c backend then fails on integers wider than 64 bits.
+    events = ((p, e, float(v) if type(v) is Decimal else v) for p, e, v in ijson.parse(fp))
+    return _iter_agents_from_events(events, ijson.common.ObjectBuilder)
+
+
+def _iter_agents_from_events(events: Iterable[Tuple[str, str, Any]], builder_cls: Any) -> Iterator[Any]:
+    """Build agents from ijson ``parse`` events, mirroring ``_agents_from_json``.
+
+    Items of a root-level list or of ``results`` are yielded as soon as each
+    one is complete. An ``agents`` list is buffered until ``results`` is known
+    to be absent, since ``results`` takes precedence. Everything else is kept in
+    a small root builder so a bare single-agent object is still returned.
+    """
+    open_lists: List[str] = []
+    root_is_list = results_seen = False
+    agents: Optional[List[Any]] = None
+    item = None
+    item_prefix = ""
+    root = builder_cls()
+
+    def _emit(prefix: str, value: Any) -> Iterator[Any]:
+        if prefix == "agents.item":
+            if agents is not None:
+                agents.append(value)
+        else:
+            yield value
+
+    for prefix, event, value in events:
+        if item is not None:
+            item.event(event, value)
+            if prefix == item_prefix and event in _ITEM_END_EVENTS:
+                yield from _emit(item_prefix, item.value)
+                item = None
+            continue
+
+        if prefix in open_lists:
+            if event in ("start_map", "start_array"):
+                item, item_prefix = builder_cls(), prefix
+                item.event(event, value)
+            else:
+                yield from _emit(prefix, value)
+            continue
+
+        if event == "start_array" and prefix in _AGENT_LIST_PREFIXES:
+            open_lists.append(f"{prefix}.item" if prefix else "item")
+            if prefix == "":
+                root_is_list = True
+            elif prefix == "results":
+                results_seen, agents = True, None
+            elif not results_seen:
+                agents = []
+        elif event == "end_array" and prefix in _AGENT_LIST_PREFIXES:
+            open_lists.remove(f"{prefix}.item" if prefix else "item")
+        root.event(event, value)
+
+    if root_is_list or results_seen:
+        return
+    if agents is not None:
+        yield from agents
+    elif isinstance(getattr(root, "value", None), dict):
+        yield root.value
+
+
+class _SSEDecoder:
+    """Incremental ``event:``/``data:`` frame parser fed one line at a time."""
+
+    def __init__(self) -> None:
+        self.event = ""
+        self.data_lines: List[str] = []
+
+    def feed(self, line: Any) -> Optional[Tuple[str, Dict[str, Any]]]:
+        if line is None:
+            return None
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        if line == "":
+            return self.flush()
+        if line.startswith(":"):
+            return None
+        field, _, value = line.partition(":")
+        if value.startswith(" "):
+            value = value[1:]
+        if field == "event":
+            self.event = value
+        elif field == "data":
+            self.data_lines.append(value)
+        return None
+
+    def flush(self) -> Optional[Tuple[str, Dict[str, Any]]]:
+        frame = _decode_sse_frame(self.event, "\n".join(self.data_lines)) if self.data_lines else None
+        self.event, self.data_lines = "", []
+        return frame
+
+
+def _iter_sse_events(lines: Iterable[Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Parse ``event:``/``data:`` frames into ``(event, data)`` pairs."""
+    decoder = _SSEDecoder()
+    for line in lines:
+        frame = decoder.feed(line)
+        if frame is not None:
+            yield frame
+    frame = decoder.flush()
+    if frame is not None:
+        yield frame
+
+
+def _decode_sse_frame(event: str, raw: str) -> Tuple[str, Dict[str, Any]]:
+    try:
+        payload = json.loads(raw)
+    except ValueError:
+        return event or "message", {"text_chunk": raw}
+    if not isinstance(payload, dict):
+        return event or "message", {"value": payload}
+    event = event or str(payload.get("event") or payload.get("type") or "message")
+    data = payload.get("data")
+    return event, data if isinstance(data, dict) else payload
+
+
+_ID_KEYS = ("id", "agent_id", "uuid")
+_NAME_KEYS = ("name", "title", "display_name")
+_DESC_KEYS = ("description", "summary")
+
+
+def _first_str(d: Dict[str, Any], *keys: str, default: str = "") -> str:
+    for k in keys:
+        v = d.get(k)
+        if v:
+            return str(v)
+    return default
+
+
+def format_agent_row(agent: Dict[str, Any], max_desc: Optional[int] = 80) -> Tuple[str, str, str]:
+    """Return ``(id, name, description)``; the description is cut to ``max_desc`` chars plus "…"."""
+    agent_id = _first_str(agent, *_ID_KEYS)
+    name = _first_str(agent, *_NAME_KEYS, default="(unnamed)")
+    desc = _first_str(agent, *_DESC_KEYS)
+    if max_desc is not None and len(desc) > max_desc:
+        desc = desc[:max_desc] + "…"
     return agent_id, name, desc
 
 
@@ -117,17 +484,15 @@ def print_help() -> None:
 
 
 def choose_agent_interactively(client: AgentBuilderClient) -> Optional[Tuple[str, str]]:
-    agents = client.list_agents()
-    if not agents:
+    rows = [format_agent_row(a) for a in client.iter_agents()]
+    if not rows:
         print("No agents found from /api/agent_builder/agents")
         return None
 
-    rows = [format_agent_row(a) for a in agents]
     print("Available agents:")
     for idx, (aid, name, desc) in enumerate(rows, start=1):
-        short_desc = (desc[:80] + "…") if len(desc) > 80 else desc
-        if short_desc:
-            print(f"  [{idx}] {name} ({aid}) — {short_desc}")
+        if desc:
+            print(f"  [{idx}] {name} ({aid}) — {desc}")
         else:
             print(f"  [{idx}] {name} ({aid})")
 
@@ -150,7 +515,13 @@ def choose_agent_interactively(client: AgentBuilderClient) -> Optional[Tuple[str
 
 
 def _safe_error_body(e: Exception) -> str:
-    if isinstance(e, requests.HTTPError) and getattr(e, "response", None) is not None:
+    import requests
+
+    http_errors: Tuple[type, ...] = (requests.HTTPError,)
+    httpx = sys.modules.get("httpx")  # only loaded by `chat --async`
+    if httpx is not None:
+        http_errors += (httpx.HTTPStatusError,)
+    if isinstance(e, http_errors) and getattr(e, "response", None) is not None:
         try:
             return e.response.text
         except Exception:
@@ -158,24 +529,48 @@ def _safe_error_body(e: Exception) -> str:
     return str(e)
 
 
+def _dumps(obj: Any, indent: bool = False) -> bytes:
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            return orjson.dumps(obj, option=option)
+        except orjson.JSONEncodeError:  # e.g. integers wider than 64 bits; stdlib json handles them
+            pass
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _print_json(obj: Any) -> None:
+    sys.stdout.flush()
+    sys.stdout.buffer.write(_dumps(obj, indent=True) + b"\n")
+    sys.stdout.buffer.flush()
+
+
+_ASSISTANT_KEYS = ("response", "output", "text", "message", "answer")
+
+
 def _extract_assistant_text(resp: Dict[str, Any]) -> str:
-    for key in ["response", "output", "text", "message", "answer"]:
-        v = resp.get(key)
-        if isinstance(v, str) and v.strip():
+    g = resp.get
+    for key in _ASSISTANT_KEYS:
+        if type(v := g(key)) is str and v and not v.isspace():
             return v
-    if isinstance(resp.get("messages"), list):
-        msgs = resp["messages"]
+    if type(msgs := g("messages")) is list:
         for m in reversed(msgs):
             if isinstance(m, dict):
                 content = m.get("content")
                 if isinstance(content, str) and content.strip():
                     return content
-    return json.dumps(resp, ensure_ascii=False)
+    return _dumps(resp).decode("utf-8")
+
 
+def _build_client(pool_maxsize: int = 16) -> AgentBuilderClient:
+    from dotenv import load_dotenv
 
-def _build_client() -> AgentBuilderClient:
-    kibana_url = os.getenv("ELASTICSEARCH_URL") or os.getenv("KIBANA_URL")
-    api_key = os.getenv("ELASTICSEARCH_API_KEY") or os.getenv("KIBANA_API_KEY") or os.getenv("API_KEY")
+    load_dotenv()
+    env = os.environ
+    kibana_url = _first(env, "ELASTICSEARCH_URL", "KIBANA_URL")
+    api_key = _first(env, "ELASTICSEARCH_API_KEY", "KIBANA_API_KEY", "API_KEY")
 
     if not kibana_url or not api_key:
         print(
@@ -186,13 +581,16 @@ def _build_client() -> AgentBuilderClient:
             "Optional:\n"
             "  KIBANA_SPACE_ID=default\n"
             "  KIBANA_VERIFY_SSL=true\n"
+            "  KIBANA_AGENTS_TTL_S=60\n"
             "  DEFAULT_AGENT_ID=elastic-ai-agent"
         )
         raise SystemExit(1)
 
-    space_id = os.getenv("ELASTIC_SPACE_ID") or os.getenv("KIBANA_SPACE_ID") or None
-    verify_ssl = _bool_env("ELASTIC_VERIFY_SSL", _bool_env("KIBANA_VERIFY_SSL", True))
-    timeout_s = int(os.getenv("ELASTIC_TIMEOUT_S", os.getenv("KIBANA_TIMEOUT_S", "300")))
+    space_id = _first(env, "ELASTIC_SPACE_ID", "KIBANA_SPACE_ID")
+    verify_raw = _first(env, "ELASTIC_VERIFY_SSL", "KIBANA_VERIFY_SSL")
+    verify_ssl = verify_raw is None or verify_raw.strip().lower() in ("1", "true", "yes", "y", "on")
+    timeout_s = int(_first(env, "ELASTIC_TIMEOUT_S", "KIBANA_TIMEOUT_S", default="300"))
+    agents_ttl_s = float(_first(env, "ELASTIC_AGENTS_TTL_S", "KIBANA_AGENTS_TTL_S", default="60"))
 
     return AgentBuilderClient(
         kibana_url=kibana_url,
@@ -200,70 +598,320 @@ def _build_client() -> AgentBuilderClient:
         space_id=space_id,
         verify_ssl=verify_ssl,
         timeout_s=timeout_s,
+        agents_ttl_s=agents_ttl_s,
+        pool_maxsize=pool_maxsize,
     )
 
 
-def run_chat(client: AgentBuilderClient) -> None:
-    current_agent_id = os.getenv("DEFAULT_AGENT_ID", "elastic-ai-agent").strip()
-    current_agent_name = current_agent_id
-    conversation_id: Optional[str] = None
+class _ReplyPrinter:
+    """Writes streamed reply events to stdout and tracks the conversation id."""
+
+    def __init__(self, conversation_id: Optional[str]):
+        self.conversation_id = conversation_id
+        self.printed = False
+
+    def handle(self, event: str, data: Dict[str, Any]) -> None:
+        self.conversation_id = data.get("conversation_id") or self.conversation_id
+        if event == "message_chunk":
+            chunk = data.get("text_chunk")
+        elif event == "message_complete" and not self.printed:
+            chunk = data.get("message_content")
+        else:
+            return
+        if not chunk:
+            return
+        if not self.printed:
+            sys.stdout.write("agent> ")
+            self.printed = True
+        sys.stdout.write(chunk)
+        sys.stdout.flush()
+
+    def end_line(self) -> None:
+        if self.printed:
+            sys.stdout.write("\n")
+            sys.stdout.flush()
+
+    def fail(self, e: Exception) -> None:
+        self.end_line()
+        print("agent> [chat failed]")
+        print(_safe_error_body(e))
+        self.printed = True
+
+
+def _stream_reply(
+    client: AgentBuilderClient,
+    user_input: str,
+    agent_id: str,
+    conversation_id: Optional[str],
+) -> Tuple[Optional[str], bool]:
+    """Print an agent reply as it streams in.
+
+    Returns the (possibly new) conversation id and whether any text was printed.
+    """
+    printer = _ReplyPrinter(conversation_id)
+    try:
+        for event, data in client.converse_stream(
+            input_text=user_input,
+            agent_id=agent_id,
+            conversation_id=conversation_id,
+        ):
+            printer.handle(event, data)
+    except Exception as e:
+        printer.fail(e)
+        return printer.conversation_id, True
+    printer.end_line()
+    return printer.conversation_id, printer.printed
+
+
+class ChatState:
+    """Mutable chat session state shared by the ``_cmd_*`` handlers."""
+
+    def __init__(
+        self,
+        client: AgentBuilderClient,
+        current_agent_id: str,
+        current_agent_name: str,
+        conversation_id: Optional[str] = None,
+    ):
+        self.client = client
+        self.current_agent_id = current_agent_id
+        self.current_agent_name = current_agent_name
+        self.conversation_id = conversation_id
+        self.running = True
+
+    @classmethod
+    def from_env(cls, client: AgentBuilderClient) -> "ChatState":
+        agent_id = os.getenv("DEFAULT_AGENT_ID", "elastic-ai-agent").strip()
+        return cls(client=client, current_agent_id=agent_id, current_agent_name=agent_id)
+
+
+def _cmd_exit(state: ChatState) -> None:
+    print("Bye!")
+    state.running = False
+
 
-    print("Connected to Kibana")
+def _cmd_help(state: ChatState) -> None:
     print_help()
-    print(f"Current agent: {current_agent_name} ({current_agent_id})")
 
-    while True:
-        user_input = input("you> ").strip()
-        if not user_input:
-            continue
 
-        cmd = user_input.lower()
-        if cmd in ("/exit", "/quit"):
-            print("Bye!")
+def _cmd_new(state: ChatState) -> None:
+    state.conversation_id = None
+    state.client.invalidate_agents_cache()
+    print("(Started new conversation)")
+
+
+def _cmd_agent(state: ChatState) -> None:
+    print(f"Current agent: {state.current_agent_name} ({state.current_agent_id})")
+
+
+def _cmd_agents(state: ChatState) -> None:
+    try:
+        picked = choose_agent_interactively(state.client)
+    except Exception as e:
+        print("agent> [failed to list agents]")
+        print(_safe_error_body(e))
+        return
+    if picked is None:
+        print("(No change)")
+        return
+    state.current_agent_id, state.current_agent_name = picked
+    state.conversation_id = None
+    print(f"(Selected agent: {state.current_agent_name} ({state.current_agent_id}); conversation reset)")
+
+
+_COMMANDS: Dict[str, Callable[[ChatState], None]] = {
+    "/exit": _cmd_exit,
+    "/quit": _cmd_exit,
+    "/elastic-help": _cmd_help,
+    "/elastic-new": _cmd_new,
+    "/elastic-agent": _cmd_agent,
+    "/elastic-agents": _cmd_agents,
+}
+
+
+def _start_chat(client: AgentBuilderClient, banner: str) -> ChatState:
+    state = ChatState.from_env(client)
+    print(banner)
+    print_help()
+    _cmd_agent(state)
+    return state
+
+
+def _read_line(prompt: str) -> Optional[str]:
+    """Prompt and read one line from stdin; ``None`` on EOF.
+
+    Reads with ``sys.stdin.readline`` rather than ``input()`` so large pastes
+    and piped input are consumed in one pass.
+    """
+    sys.stdout.write(prompt)
+    sys.stdout.flush()
+    line = sys.stdin.readline()
+    if not line:
+        return None
+    return line.rstrip("\r\n")
+
+
+def run_chat(client: AgentBuilderClient) -> None:
+    state = _start_chat(client, "Connected to Kibana")
+
+    while state.running:
+        line = _read_line("you> ")
+        if line is None:
+            _cmd_exit(state)
             break
-        if cmd == "/elastic-help":
-            print_help()
-            continue
-        if cmd == "/elastic-new":
-            conversation_id = None
-            print("(Started new conversation)")
+        user_input = line.strip()
+        if not user_input:
             continue
-        if cmd == "/elastic-agent":
-            print(f"Current agent: {current_agent_name} ({current_agent_id})")
+
+        handler = _COMMANDS.get(user_input.lower())
+        if handler:
+            handler(state)
             continue
-        if cmd == "/elastic-agents":
+
+        state.conversation_id, printed = _stream_reply(
+            client, user_input, state.current_agent_id, state.conversation_id
+        )
+        if not printed:
+            print("agent> [no message received]")
+
+
+def _async_http_client(client: AgentBuilderClient) -> "httpx.AsyncClient":
+    import httpx
+
+    # HTTP/2 needs the optional `h2` package; fall back to HTTP/1.1 keep-alive without it.
+    return httpx.AsyncClient(
+        headers=client.headers,
+        verify=client.verify_ssl,
+        timeout=httpx.Timeout(client.timeout_s),
+        http2=importlib.util.find_spec("h2") is not None,
+        limits=httpx.Limits(max_keepalive_connections=8),
+    )
+
+
+async def _aconverse_stream(
+    http: "httpx.AsyncClient",
+    client: AgentBuilderClient,
+    input_text: str,
+    agent_id: str,
+    conversation_id: Optional[str] = None,
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    payload = client._converse_payload(input_text, agent_id, conversation_id)
+    body = orjson.dumps(payload) if orjson is not None else json.dumps(payload).encode("utf-8")
+
+    headers = {"Accept": "text/event-stream"}
+    async with http.stream("POST", client._url_converse_stream, content=body, headers=headers) as resp:
+        if resp.status_code == 404:
+            client.invalidate_agents_cache()
+        if resp.is_error:
+            await resp.aread()
+        resp.raise_for_status()
+        decoder = _SSEDecoder()
+        async for line in resp.aiter_lines():
+            frame = decoder.feed(line.rstrip("\r\n"))
+            if frame is not None:
+                yield frame
+        frame = decoder.flush()
+        if frame is not None:
+            yield frame
+
+
+async def _ainput(prompt: str) -> str:
+    """Prompt for a line on a daemon thread and await it.
+
+    The chat loop awaits this and the reply one after the other, so nothing
+    streams while the prompt is open. The daemon thread (rather than
+    ``asyncio.to_thread``) only exists so a pending read never holds up
+    interpreter shutdown after Ctrl-C.
+    """
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    fut: "asyncio.Future[str]" = loop.create_future()
+
+    def _settle(method: str, value: Any) -> None:
+        if not fut.done():
+            getattr(fut, method)(value)
+
+    def _read() -> None:
+        try:
+            line = _read_line(prompt)
+            if line is None:
+                raise EOFError
+        except BaseException as e:  # EOFError / KeyboardInterrupt are forwarded to the loop
+            loop.call_soon_threadsafe(_settle, "set_exception", e)
+        else:
+            loop.call_soon_threadsafe(_settle, "set_result", line)
+
+    threading.Thread(target=_read, daemon=True).start()
+    return await fut
+
+
+async def _astream_reply(
+    http: "httpx.AsyncClient",
+    client: AgentBuilderClient,
+    user_input: str,
+    agent_id: str,
+    conversation_id: Optional[str],
+) -> Tuple[Optional[str], bool]:
+    import asyncio
+
+    printer = _ReplyPrinter(conversation_id)
+    try:
+        async for event, data in _aconverse_stream(http, client, user_input, agent_id, conversation_id):
+            printer.handle(event, data)
+    except asyncio.CancelledError:
+        printer.end_line()
+        print("(interrupted)")
+        return printer.conversation_id, True
+    except Exception as e:
+        printer.fail(e)
+        return printer.conversation_id, True
+    printer.end_line()
+    return printer.conversation_id, printer.printed
+
+
+async def _run_reply_interruptibly(coro: Any) -> Tuple[Optional[str], bool]:
+    """Run a reply task so Ctrl-C cancels the generation instead of the chat."""
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    task = asyncio.ensure_future(coro)
+    previous = signal.getsignal(signal.SIGINT)
+    try:
+        loop.add_signal_handler(signal.SIGINT, task.cancel)
+    except (NotImplementedError, RuntimeError):  # e.g. Windows or not on the main thread
+        return await task
+    try:
+        return await task
+    finally:
+        loop.remove_signal_handler(signal.SIGINT)
+        signal.signal(signal.SIGINT, previous)
+
+
+async def run_chat_async(client: AgentBuilderClient) -> None:
+    """Chat over httpx; turns are sequential, but Ctrl-C cancels only the current reply."""
+    state = _start_chat(client, "Connected to Kibana (async)")
+
+    async with _async_http_client(client) as http:
+        while state.running:
             try:
-                picked = choose_agent_interactively(client)
-            except Exception as e:
-                print("agent> [failed to list agents]")
-                print(_safe_error_body(e))
+                user_input = (await _ainput("you> ")).strip()
+            except EOFError:
+                _cmd_exit(state)
+                break
+            if not user_input:
                 continue
-            if picked is None:
-                print("(No change)")
+
+            handler = _COMMANDS.get(user_input.lower())
+            if handler:
+                handler(state)
                 continue
-            current_agent_id, current_agent_name = picked
-            conversation_id = None
-            print(f"(Selected agent: {current_agent_name} ({current_agent_id}); conversation reset)")
-            continue
 
-        try:
-            data = client.converse(
-                input_text=user_input,
-                agent_id=current_agent_id,
-                conversation_id=conversation_id,
+            state.conversation_id, printed = await _run_reply_interruptibly(
+                _astream_reply(http, client, user_input, state.current_agent_id, state.conversation_id)
             )
-        except Exception as e:
-            print("agent> [chat failed]")
-            print(_safe_error_body(e))
-            continue
-
-        conversation_id = data.get("conversation_id") or conversation_id
-        message = (data.get("response") or {}).get("message") if isinstance(data, dict) else None
-        if message is None:
-            print("agent> [no response.message found; dumping full response]")
-            print(json.dumps(data, indent=2))
-        else:
-            print(f"agent> {message}")
+            if not printed:
+                print("agent> [no message received]")
 
 
 def main():
@@ -271,7 +919,13 @@ def main():
     sub = parser.add_subparsers(dest="command", required=True)
 
     sub.add_parser("list-agents", help="List Agent Builder agents")
-    sub.add_parser("chat", help="Interactive chat with /elastic-* commands")
+    ch = sub.add_parser("chat", help="Interactive chat with /elastic-* commands")
+    ch.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="Use the asyncio/httpx chat loop (Ctrl-C interrupts a reply; requires httpx)",
+    )
 
     c = sub.add_parser("converse", help="Send a converse request")
     c.add_argument("--agent-id", required=True)
@@ -281,20 +935,66 @@ def main():
     c.add_argument("--configuration-overrides", help="JSON object")
     c.add_argument("--prompts", help="JSON object")
 
+    b = sub.add_parser("batch-converse", help="Send one converse request per input line")
+    b.add_argument("--agent-id", required=True)
+    b.add_argument("--inputs-file", required=True, help="File with one prompt per line ('-' for stdin)")
+    b.add_argument("--max-concurrency", type=int, default=1)
+    b.add_argument("--coalesce", action="store_true", help="Share one request between identical in-flight prompts")
+    b.add_argument("--connector-id")
+    b.add_argument("--configuration-overrides", help="JSON object")
+    b.add_argument("--prompts", help="JSON object")
+
     args = parser.parse_args()
-    client = _build_client()
+    max_concurrency = getattr(args, "max_concurrency", 1)
+    client = _build_client(pool_maxsize=max(16, max_concurrency))
 
     if args.command == "list-agents":
-        print(json.dumps(client.list_agents(), indent=2))
+        _print_json(client.list_agents())
         return
 
     if args.command == "chat":
-        run_chat(client)
+        if not args.use_async:
+            run_chat(client)
+            return
+        if importlib.util.find_spec("httpx") is None:
+            print("chat --async requires httpx: pip install 'httpx[http2]'")
+            raise SystemExit(1)
+        import asyncio
+
+        try:
+            asyncio.run(run_chat_async(client))
+        except KeyboardInterrupt:
+            print("\nBye!")
         return
 
     configuration_overrides = json.loads(args.configuration_overrides) if args.configuration_overrides else None
     prompts = json.loads(args.prompts) if args.prompts else None
 
+    if args.command == "batch-converse":
+        if args.inputs_file == "-":
+            lines = sys.stdin.read().splitlines()
+        else:
+            with open(args.inputs_file, encoding="utf-8") as f:
+                lines = f.read().splitlines()
+        inputs = [line for line in lines if line.strip()]
+        results = client.converse_many(
+            inputs,
+            agent_id=args.agent_id,
+            max_concurrency=args.max_concurrency,
+            return_exceptions=True,
+            coalesce=args.coalesce,
+            connector_id=args.connector_id,
+            configuration_overrides=configuration_overrides,
+            prompts=prompts,
+        )
+        _print_json(
+            [
+                {"input": text, "error": _safe_error_body(r)} if isinstance(r, Exception) else r
+                for text, r in zip(inputs, results)
+            ]
+        )
+        return
+
     result = client.converse(
         input_text=args.input,
         agent_id=args.agent_id,
@@ -303,7 +1003,7 @@ def main():
         configuration_overrides=configuration_overrides,
         prompts=prompts,
     )
-    print(json.dumps(result, indent=2))
+    _print_json(result)
 
 
 if __name__ == "__main__":
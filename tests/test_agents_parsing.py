@@ -0,0 +1,62 @@
+import io
+import json
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+import elastic_agent_builder as eab  # noqa: E402
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+RESPONSES = [
+    {"results": [{"id": "a", "t": 0.7, "tools": [1, [2.5]]}, {"id": "b"}]},
+    {"agents": [{"id": "ag", "score": 1e-3}]},
+    {"results": [{"id": "a"}, {"id": "big", "n": 2**70, "neg": -(2**80), "f": 1.5e300}]},
+    {"agents": [{"id": "ag"}], "results": [{"id": "r"}]},
+    {"results": [{"id": "r"}], "agents": [{"id": "ag"}]},
+    {"results": [{"a": {"results": [9]}}], "agents": [1]},
+    {"results": []},
+    {"results": "x"},
+    {"results": {"item": {"id": "nested"}}},
+    {"id": "single", "tags": ["x"]},
+    [{"id": "l1"}, "s", [1]],
+    [],
+    "str",
+]
+
+
+def _print_json_bytes(obj):
+    out = io.TextIOWrapper(io.BytesIO(), encoding="utf-8")
+    with mock.patch.object(sys, "stdout", out):
+        eab._print_json(obj)
+    return out.buffer.getvalue()
+
+
+@unittest.skipIf(ijson is None, "ijson not installed")
+class StreamedAgentsMatchJsonTest(unittest.TestCase):
+    def test_same_agents_as_resp_json(self):
+        for data in RESPONSES:
+            body = json.dumps(data).encode("utf-8")
+            with self.subTest(data=data):
+                streamed = list(eab._iter_agents_from_ijson(io.BytesIO(body)))
+                self.assertEqual(streamed, eab._agents_from_json(json.loads(body)))
+
+    def test_same_printed_output_as_resp_json(self):
+        for data in RESPONSES:
+            body = json.dumps(data).encode("utf-8")
+            with self.subTest(data=data):
+                streamed = list(eab._iter_agents_from_ijson(io.BytesIO(body)))
+                self.assertEqual(
+                    _print_json_bytes(streamed),
+                    _print_json_bytes(eab._agents_from_json(json.loads(body))),
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()